@@ -0,0 +1,189 @@
+import json
+from datetime import datetime, timedelta
+import boto3
+from boto3.dynamodb.conditions import Key
+import eventScheduleAdjusting
+import groupAvailabilityIndex
+from eventScheduleAdjusting import time_to_minutes
+
+dynamodb = boto3.resource("dynamodb")
+confirmed_table = dynamodb.Table('confirmedMeetings')
+# date 를 파티션 키로 하는 GSI - 기간 안의 날짜만 조회
+CONFIRMED_DATE_INDEX = 'date-index'
+
+
+def minutes_to_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def meeting_interval(day, start_time, duration):
+    end_time = minutes_to_time(time_to_minutes(start_time) + int(float(duration) * 60))
+    return (day, start_time, end_time)
+
+def save_confirmed_meeting(meeting_id, participants, date, start_time, duration):
+    item = {
+        "meeting_id": meeting_id,
+        "participants": participants,
+        "date": date,
+        "start_time": start_time,
+        "duration": str(duration),
+        "createdAt": datetime.utcnow().isoformat(),
+        # 회의 다음 날 DynamoDB TTL 로 삭제
+        "expiresAt": int((datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).timestamp())
+    }
+    confirmed_table.put_item(Item=item)
+    print(f"[INFO] 확정된 회의 저장 완료: {item}")
+
+def load_confirmed_meetings(start_date, end_date):
+    """
+    Confirmed meetings on the weekdays between start_date and end_date, one query per date.
+    """
+    meetings = []
+    for date, day in eventScheduleAdjusting.date_to_weekday_dates(start_date, end_date):
+        query_kwargs = {
+            "IndexName": CONFIRMED_DATE_INDEX,
+            "KeyConditionExpression": Key("date").eq(date)
+        }
+        while True:
+            response = confirmed_table.query(**query_kwargs)
+            meetings.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                break
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return meetings
+
+def add_busy_time(busy_by_date, date, participants, start_time, duration):
+    day = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+    interval = meeting_interval(day, start_time, duration)
+    for participant in participants:
+        busy_by_date.setdefault(date, {}).setdefault(participant, []).append(interval)
+
+def confirmed_busy_times(confirmed_meetings):
+    """
+    Busy intervals from confirmed meetings, keyed by date and then participant.
+    """
+    busy_by_date = {}
+    for meeting in confirmed_meetings:
+        add_busy_time(busy_by_date, meeting["date"], meeting["participants"], meeting["start_time"], meeting["duration"])
+    return busy_by_date
+
+def find_best_dated_time_slot(base_schedule, participants, start_date, end_date, duration, busy_by_date):
+    """
+    Like eventScheduleAdjusting.find_best_time_slot, but per date: busy time from
+    busy_by_date only applies on its own date. Returns (date, time) slots.
+    """
+    weekday_dates = eventScheduleAdjusting.date_to_weekday_dates(start_date, end_date)
+
+    # 날짜마다 같은 인원을 세도록, 기간 안에 바쁜 시간이 있는 사람도 포함
+    counted = {
+        participant for participant in participants
+        if participant in base_schedule or any(participant in busy_by_date.get(date, {}) for date, day in weekday_dates)
+    }
+
+    best_time_slots = []
+    max_participants = 0
+    unavailable = []
+
+    for date, day in weekday_dates:
+        extra = busy_by_date.get(date, {})
+        users_schedule = {
+            participant: base_schedule.get(participant, []) + extra.get(participant, [])
+            for participant in counted
+        }
+        slots, participants_count, unavailable_people = eventScheduleAdjusting.find_best_time_slot(users_schedule, participants, duration, [day])
+        unavailable.extend(unavailable_people)
+
+        if participants_count > max_participants:
+            max_participants = participants_count
+            best_time_slots = [(date, time) for slot_day, time in slots]
+        elif participants_count == max_participants:
+            best_time_slots.extend((date, time) for slot_day, time in slots)
+
+    return best_time_slots, max_participants, unavailable
+
+def find_best_dated_slots(channel_id, participants, start_date, end_date, duration, exclude_meeting_id=None):
+    """
+    Best (date, time) slots for one meeting, treating confirmed meetings of its participants
+    as busy time. Without any such meeting the group availability index answers directly;
+    otherwise the participants' timetables are loaded and solved per date.
+    """
+    confirmed_meetings = [
+        meeting for meeting in load_confirmed_meetings(start_date, end_date)
+        if meeting["meeting_id"] != exclude_meeting_id and set(meeting["participants"]) & set(participants)
+    ]
+
+    if confirmed_meetings:
+        base_schedule = eventScheduleAdjusting.get_user_schedules(participants)
+        return find_best_dated_time_slot(base_schedule, participants, start_date, end_date, float(duration), confirmed_busy_times(confirmed_meetings))
+
+    weekday_dates = eventScheduleAdjusting.date_to_weekday_dates(start_date, end_date)
+    weekdays = list(dict.fromkeys(day for date, day in weekday_dates))
+    slots, max_participants, unavailable_people = groupAvailabilityIndex.get_group_best_time_slot(channel_id, participants, float(duration), weekdays)
+
+    slots_by_day = {}
+    for day, time in slots:
+        slots_by_day.setdefault(day, []).append(time)
+    best_time_slots = [(date, time) for date, day in weekday_dates for time in slots_by_day.get(day, [])]
+    return best_time_slots, max_participants, unavailable_people
+
+def schedule_meetings_batch(meeting_requests, confirmed_meetings=None):
+    """
+    Assign slots to several meeting requests at once.
+    Schedules for the union of participants are loaded once, and requests are solved
+    greedily (most participants, then longest, then earliest end date first) so every
+    assigned slot and every confirmed meeting counts as busy time for later requests on
+    the same date. Each request is a dict with id, participants, start_date, end_date and duration.
+    """
+    all_participants = sorted({participant for request in meeting_requests for participant in request["participants"]})
+    base_schedule = eventScheduleAdjusting.get_user_schedules(all_participants)
+
+    if confirmed_meetings is None and meeting_requests:
+        confirmed_meetings = load_confirmed_meetings(
+            min(request["start_date"] for request in meeting_requests),
+            max(request["end_date"] for request in meeting_requests)
+        )
+
+    ordered = sorted(
+        meeting_requests,
+        key=lambda request: (-len(request["participants"]), -float(request["duration"]), request["end_date"])
+    )
+
+    # 확정된 회의와 배정된 회의 모두 날짜별로 바쁜 시간이 됨
+    busy_by_date = confirmed_busy_times(confirmed_meetings or [])
+    assignments = {}
+
+    for request in ordered:
+        participants = request["participants"]
+        duration = float(request["duration"])
+
+        best_time_slots, max_participants, unavailable_people = find_best_dated_time_slot(
+            base_schedule, participants, request["start_date"], request["end_date"], duration, busy_by_date
+        )
+
+        date, time = best_time_slots[0] if best_time_slots else (None, None)
+        if date:
+            add_busy_time(busy_by_date, date, participants, time, duration)
+
+        assignments[request["id"]] = {
+            "id": request["id"],
+            "date": date,
+            "day": datetime.strptime(date, "%Y-%m-%d").strftime("%A") if date else None,
+            "time": time,
+            "max_participants": max_participants,
+            "best_time_slots": best_time_slots
+        }
+
+    # 요청 순서대로 반환
+    return [assignments[request["id"]] for request in meeting_requests]
+
+def lambda_handler(event, context):
+    # 대기 중인 회의 요청을 한 번에 배정
+    meeting_requests = event["requests"]
+    assignments = schedule_meetings_batch(meeting_requests, event.get("confirmed_meetings"))
+
+    for assignment in assignments:
+        print(f"{assignment['id']}: {assignment['date']} {assignment['time']} (참석 가능 인원: {assignment['max_participants']}명)")
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'assignments': assignments})
+    }
@@ -0,0 +1,207 @@
+import json
+import re
+from botocore.exceptions import ClientError
+from datetime import datetime
+from claudeRequestBuilder import build_request_body, invoke_claude, SONNET_MODEL_ID, HAIKU_MODEL_ID
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+TIME_REGEX = re.compile(r"^\d{2}:\d{2}$")
+DATE_REGEX = re.compile(r"\d{4}-\d{2}-\d{2}")
+MENTION_REGEX = re.compile(r"<@([A-Z0-9]+)>")
+# combine_thread_messages 가 붙이는 "<@U...>: " / "Bot: " 줄 머리
+LINE_PREFIX_REGEX = re.compile(r"^(?:Bot|<@([A-Z0-9]+)>):\s*")
+DURATION_REGEX = re.compile(r"\d+(?:\.\d+)?\s*(시간|분|hours?|minutes?|mins?)", re.IGNORECASE)
+
+REPAIR_PROMPT = '''Your previous output did not match the required format.
+Errors:
+{errors}
+
+Respond again with only the corrected JSON. No additional information or content should be added.'''
+
+
+def is_valid_time(value):
+    if not isinstance(value, str) or not TIME_REGEX.match(value):
+        return False
+    hours, minutes = map(int, value.split(":"))
+    return 0 <= hours <= 24 and 0 <= minutes < 60
+
+
+def is_valid_date(value, fmt="%Y-%m-%d"):
+    try:
+        datetime.strptime(value, fmt)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_timetable(data):
+    if not isinstance(data, dict):
+        return ["The output must be a JSON object keyed by weekday."]
+
+    errors = []
+    for day, classes in data.items():
+        if day not in WEEKDAYS:
+            errors.append(f"'{day}' is not a weekday name (e.g. Monday).")
+            continue
+        if not isinstance(classes, list):
+            errors.append(f"'{day}' must be a list of classes.")
+            continue
+        for item in classes:
+            if not isinstance(item, dict):
+                errors.append(f"Every class in '{day}' must be an object.")
+                continue
+            start_time = item.get("start_time")
+            end_time = item.get("end_time")
+            if not is_valid_time(start_time) or not is_valid_time(end_time):
+                errors.append(f"start_time and end_time in '{day}' must be in HH:MM format. (got {start_time}, {end_time})")
+            elif start_time >= end_time:
+                errors.append(f"start_time must be before end_time in '{day}'. (got {start_time}, {end_time})")
+            if not isinstance(item.get("name"), str):
+                errors.append(f"Every class in '{day}' must have a name.")
+    return errors
+
+
+def validate_meeting_info(data):
+    if not isinstance(data, dict):
+        return ["The output must be a JSON object."]
+
+    errors = []
+    participants = data.get("participants")
+    if not isinstance(participants, list) or not all(isinstance(participant, str) for participant in participants):
+        errors.append("'participants' must be a list of slack user IDs. (use an empty list if unknown)")
+
+    # 추가 정보를 요청하는 경우 참석자 외의 필드는 비어있을 수 있음
+    if data.get("request"):
+        if not isinstance(data["request"], str):
+            errors.append("'request' must be a string.")
+        return errors
+
+    try:
+        if float(data.get("meeting_duration")) <= 0:
+            errors.append("'meeting_duration' must be a positive number of hours.")
+    except (TypeError, ValueError):
+        errors.append("'meeting_duration' must be a number of hours. (e.g. 1.5)")
+
+    date_range = data.get("meeting_date_range")
+    dates = date_range.split(" to ") if isinstance(date_range, str) else []
+    if len(dates) != 2 or not all(is_valid_date(date) for date in dates):
+        errors.append("'meeting_date_range' must be in the format of 'YYYY-MM-DD to YYYY-MM-DD'.")
+
+    if not is_valid_date(data.get("meeting_schedule_finalization_deadline")):
+        errors.append("'meeting_schedule_finalization_deadline' must be in the format of 'YYYY-MM-DD'.")
+    return errors
+
+
+def validate_meeting_preference(data):
+    if not isinstance(data, dict):
+        return ["The output must be a JSON object."]
+
+    errors = []
+    if not is_valid_date(data.get("best_time"), "%Y-%m-%d %H:%M"):
+        errors.append("'best_time' must be in the format of 'YYYY-MM-DD HH:MM'.")
+
+    participants = data.get("participants")
+    if not isinstance(participants, list):
+        errors.append("'participants' must be a list.")
+        return errors
+    for participant in participants:
+        if not isinstance(participant, dict) or not isinstance(participant.get("user_id"), str) or not isinstance(participant.get("preference"), str):
+            errors.append("Every participant must have a string 'user_id' and a string 'preference'.")
+            break
+    return errors
+
+
+def is_simple_timetable(prompt, image_data):
+    # 이미지는 Haiku가 처리할 수 없으므로 텍스트 시간표만 단순 요청으로 본다
+    return not image_data and bool(prompt)
+
+
+def participant_mentions(prompt, bot_user_id=None):
+    """
+    Users mentioned in the message bodies of a combined thread,
+    ignoring the sender prefixes, the bot's own messages and the bot mention.
+    """
+    mentions = set()
+    for line in prompt.splitlines():
+        prefix = LINE_PREFIX_REGEX.match(line)
+        if prefix and (line.startswith("Bot:") or prefix.group(1) == bot_user_id):
+            continue
+        body = line[prefix.end():] if prefix else line
+        mentions.update(user for user in MENTION_REGEX.findall(body) if user != bot_user_id)
+    return mentions
+
+
+def is_simple_meeting_request(prompt, bot_user_id=None):
+    # 날짜, 참석자, 회의 시간이 모두 명시된 경우
+    return bool(DATE_REGEX.search(prompt) and participant_mentions(prompt, bot_user_id) and DURATION_REGEX.search(prompt))
+
+
+def is_simple_meeting_preference(best_time_slots):
+    # 후보 시간이 적으면 고르기 쉬움
+    return len(best_time_slots) <= 3
+
+
+def parse_json_output(text):
+    """
+    Parse the model output as JSON, tolerating code fences or text around the object.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        start = text.find("{")
+        end = text.rfind("}")
+        if start == -1 or end <= start:
+            raise
+        return json.loads(text[start:end + 1])
+
+
+def parse_and_validate(text, validator):
+    try:
+        data = parse_json_output(text)
+    except ValueError as e:
+        return None, [f"The output is not valid JSON: {e}"]
+    return data, validator(data)
+
+
+def invoke_with_routing(bedrock_runtime, static_block, content, validator, simple, volatile_text=None):
+    """
+    Try the fast model first for simple inputs, escalate to Sonnet when its output
+    fails validation, and as a last resort send Sonnet a short repair prompt.
+    Returns the validated data; raises ValueError if the output is still invalid.
+    """
+    model_ids = [HAIKU_MODEL_ID, SONNET_MODEL_ID] if simple else [SONNET_MODEL_ID]
+
+    for model_id in model_ids:
+        body = build_request_body(static_block, content, volatile_text=volatile_text, model_id=model_id)
+        try:
+            response_body = invoke_claude(bedrock_runtime, body, model_id=model_id)
+        except ClientError as e:
+            if model_id == SONNET_MODEL_ID:
+                raise
+            # 스로틀링, 모델 접근 권한 없음 등 - Sonnet으로 전환
+            print(f"Bedrock API 에러 ({model_id}), Sonnet으로 전환: {e}")
+            continue
+        text = response_body['content'][0]['text']
+        print(f"model response ({model_id}):", text)
+
+        data, errors = parse_and_validate(text, validator)
+        if not errors:
+            return data
+        print(f"validation failed ({model_id}):", errors)
+
+    # 마지막 응답과 오류를 알려주고 한 번만 수정 요청
+    messages = [
+        {"role": "user", "content": content},
+        {"role": "assistant", "content": [{"type": "text", "text": text}]},
+        {"role": "user", "content": [{"type": "text", "text": REPAIR_PROMPT.format(errors="\n".join(f"- {error}" for error in errors))}]}
+    ]
+    body = build_request_body(static_block, content, volatile_text=volatile_text, temperature=0, messages=messages)
+    response_body = invoke_claude(bedrock_runtime, body)
+    text = response_body['content'][0]['text']
+    print("model response (repair):", text)
+
+    data, errors = parse_and_validate(text, validator)
+    if errors:
+        raise ValueError(f"Invalid model output after repair: {errors}")
+    return data
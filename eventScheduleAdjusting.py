@@ -14,18 +14,24 @@ slack_client = WebClient(token=SLACK_BOT_TOKEN)
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table('testDB')
 
+# 회의 시작 가능 시각 (12:00 ~ 23:30, 30분 간격)
+TIME_SLOTS = [f"{hour:02d}:{minute:02d}" for hour in range(12, 24) for minute in range(0, 60, 30)]
+
 
 def date_to_weekdays(start_date, end_date):
+    return [weekday for date, weekday in date_to_weekday_dates(start_date, end_date)]
+
+def date_to_weekday_dates(start_date, end_date):
     start = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
-    weekdays = []
+    weekday_dates = []
     current_date = start
     while current_date <= end:
         weekday = current_date.strftime("%A")
         if weekday not in ["Saturday", "Sunday"]:
-            weekdays.append(weekday)
+            weekday_dates.append((current_date.strftime("%Y-%m-%d"), weekday))
         current_date += timedelta(days=1)
-    return weekdays
+    return weekday_dates
 
 def time_to_minutes(time_str):
     hours, minutes = map(int, time_str.split(":"))
@@ -39,7 +45,7 @@ def is_time_overlapping(time_slot, duration, start_time, end_time):
     return not (slot_end <= start or slot_start >= end)
 
 def find_best_time_slot(users_schedule, user_id, duration, weekdays):
-    time_slots = [f"{hour:02d}:{minute:02d}" for hour in range(12, 24) for minute in range(0, 60, 30)]
+    time_slots = TIME_SLOTS
     best_time_slots = []
     unavailable = []
     max_participants = 0
@@ -74,29 +80,46 @@ def find_best_time_slot(users_schedule, user_id, duration, weekdays):
 
     return best_time_slots, max_participants, unavailable
 
-def get_user_schedules(participants_id):
+def get_user_schedule_items(participants_id, consistent_read=False):
+    """
+    The stored timetable item of each participant (the last one, as get_user_schedules uses).
+    Participants without a timetable are left out.
+    """
     data = []
     for participant_id in participants_id:
         response = table.query(
-            KeyConditionExpression = Key('name').eq(participant_id)
+            KeyConditionExpression = Key('name').eq(participant_id),
+            ConsistentRead = consistent_read
         )
         data.extend(response.get('Items', []))
+
+    user_items = {}
+
+    for user in data:
+        user_items[user["name"]] = user
+
+    return user_items
+
+def get_user_schedules(participants_id, consistent_read=False):
+    user_items = get_user_schedule_items(participants_id, consistent_read)
     
     users_schedule = {}
 
-    for user in data:
-        participant_id = user["name"]
-        schedule_data = json.loads(user["schedule"])
-        times = []
-        for day, day_schedule in schedule_data.items():
-            for item in day_schedule:
-                start_time = item["start_time"]
-                end_time = item["end_time"]
-                times.append((day, start_time, end_time))
-        users_schedule[participant_id] = times
+    for name, user in user_items.items():
+        users_schedule[name] = parse_schedule(user["schedule"])
 
     return users_schedule
 
+def parse_schedule(schedule):
+    schedule_data = json.loads(schedule)
+    times = []
+    for day, day_schedule in schedule_data.items():
+        for item in day_schedule:
+            start_time = item["start_time"]
+            end_time = item["end_time"]
+            times.append((day, start_time, end_time))
+    return times
+
 def lambda_handler(event, context):
     # 불가능한 시간 조정
 
@@ -1,82 +1,85 @@
 import json
+from claudeRequestBuilder import build_static_system_block
+from claudeModelRouter import invoke_with_routing, validate_timetable, is_simple_timetable
 
-
-def get_claude_timetable_response(bedrock_runtime, prompt, image_data, mimetype):
-    timetable_structure = {
-        "Monday": [
-            {
-                "start_time": "The start time of the class. (e.g. 09:00)",
-                "end_time": "The end time of the class. (e.g. 10:00)",
-                "name": "The name of the class. (e.g. Introduction to Computer Science)",
-                "index": "The index of the class. (e.g. 1)"
-            }
-        ],
-        "Tuesday": [],
-        "Wednesday": [],
-        "Thursday": [],
-        "Friday": []
-    }
-
-    timetable_example = {
-      "Monday": [
-        {
-          "start_time": "11:00",
-          "end_time": "12:00",
-          "name": "사회물리학: 네트워크적 접근",
-          "index": 1
-        },
+TIMETABLE_STRUCTURE = {
+    "Monday": [
         {
-          "start_time": "13:00",
-          "end_time": "15:00",
-          "name": "AI 원리 및 최신기술",
-          "index": 2
-        },
-      ],
-      "Tuesday": [
-        {
-          "start_time": "09:00",
-          "end_time": "12:00",
-          "name": "확장현실 프로젝트",
-          "index": 1
+            "start_time": "The start time of the class. (e.g. 09:00)",
+            "end_time": "The end time of the class. (e.g. 10:00)",
+            "name": "The name of the class. (e.g. Introduction to Computer Science)",
+            "index": "The index of the class. (e.g. 1)"
         }
-      ],
-      "Wednesday": [],
-      "Thursday": [
-        {
-          "start_time": "11:00",
-          "end_time": "12:00",
-          "name": "사회물리학: 네트워크적 접근",
-          "index": 1
-        },
-        {
-          "start_time": "13:00",
-          "end_time": "14:00",
-          "name": "다변수해석학과 응용",
-          "index": 2
-        },
-        {
-          "start_time": "16:00",
-          "end_time": "17:00",
-          "name": "프로그래밍 언어 및 컴파일러",
-          "index": 3
-        }
-      ],
-      "Friday": []
+    ],
+    "Tuesday": [],
+    "Wednesday": [],
+    "Thursday": [],
+    "Friday": []
+}
+
+TIMETABLE_EXAMPLE = {
+  "Monday": [
+    {
+      "start_time": "11:00",
+      "end_time": "12:00",
+      "name": "사회물리학: 네트워크적 접근",
+      "index": 1
+    },
+    {
+      "start_time": "13:00",
+      "end_time": "15:00",
+      "name": "AI 원리 및 최신기술",
+      "index": 2
+    },
+  ],
+  "Tuesday": [
+    {
+      "start_time": "09:00",
+      "end_time": "12:00",
+      "name": "확장현실 프로젝트",
+      "index": 1
     }
+  ],
+  "Wednesday": [],
+  "Thursday": [
+    {
+      "start_time": "11:00",
+      "end_time": "12:00",
+      "name": "사회물리학: 네트워크적 접근",
+      "index": 1
+    },
+    {
+      "start_time": "13:00",
+      "end_time": "14:00",
+      "name": "다변수해석학과 응용",
+      "index": 2
+    },
+    {
+      "start_time": "16:00",
+      "end_time": "17:00",
+      "name": "프로그래밍 언어 및 컴파일러",
+      "index": 3
+    }
+  ],
+  "Friday": []
+}
+
+SYSTEM_PROMPT = f'''You are a time table manager for a school club. Users will give you their timetables in various formats, not limited to text and images. Analyze the message and extract the timetable information. Respond with the extracted information in the following structured format:
 
-    system_prompt = f'''You are a time table manager for a school club. Users will give you their timetables in various formats, not limited to text and images. Analyze the message and extract the timetable information. Respond with the extracted information in the following structured format:
+# Format
+{json.dumps(TIMETABLE_STRUCTURE)}
 
-    # Format
-    {json.dumps(timetable_structure)}
+# Example
+{json.dumps(TIMETABLE_EXAMPLE)}
 
-    # Example
-    {json.dumps(timetable_example)}
+# Note
+- If the given information is not enough to extract the timetable. Do not ask for additional information.
+'''
 
-    # Note
-    - If the given information is not enough to extract the timetable. Do not ask for additional information.
-    '''
+STATIC_SYSTEM_BLOCK = build_static_system_block(SYSTEM_PROMPT)
 
 
+def get_claude_timetable_response(bedrock_runtime, prompt, image_data, mimetype):
     prompt = prompt if prompt else "empty"
 
     try:
@@ -97,30 +100,9 @@ def get_claude_timetable_response(bedrock_runtime, prompt, image_data, mimetype)
             "text": prompt
         })
 
-        # Bedrock 요청 바디 구성
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4096,
-            "system": system_prompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": content
-                }
-            ],
-            "temperature": 0.7
-        })
-        
-        # Bedrock API 호출
-        response = bedrock_runtime.invoke_model(
-            modelId='anthropic.claude-3-5-sonnet-20241022-v2:0',
-            contentType='application/json',
-            body=body
-        )
-        
-        # 응답 파싱
-        response_body = json.loads(response['body'].read())
-        return response_body['content'][0]['text']
+        # 단순한 텍스트 시간표는 빠른 모델부터 시도하고, 검증 실패 시 Sonnet으로 전환
+        timetable = invoke_with_routing(bedrock_runtime, STATIC_SYSTEM_BLOCK, content, validate_timetable, is_simple_timetable(prompt, image_data))
+        return json.dumps(timetable, ensure_ascii=False)
         
     except Exception as e:
         print(f"Bedrock API 에러: {str(e)}")
@@ -0,0 +1,275 @@
+import json
+import hashlib
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+import eventScheduleAdjusting
+from eventScheduleAdjusting import TIME_SLOTS, is_time_overlapping
+
+dynamodb = boto3.resource("dynamodb")
+index_table = dynamodb.Table('groupAvailabilityIndex')
+# 멤버 -> 그 멤버가 속한 그룹 인덱스 (시간표 변경 시 스캔 없이 찾기 위함)
+membership_table = dynamodb.Table('groupMembership')
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+# 30분 단위로 0.5시간 ~ 4시간 회의까지 인덱싱 (그 외 길이는 기존 방식으로 계산)
+MAX_INDEXED_HALF_HOURS = 8
+
+MAX_UPDATE_RETRIES = 3
+
+
+def get_group_id(channel_id, members):
+    members_hash = hashlib.sha1(",".join(sorted(members)).encode()).hexdigest()[:16]
+    return f"{channel_id}#{members_hash}"
+
+def duration_key(duration):
+    """
+    Index key for a meeting duration in hours, or None if it is not indexed.
+    """
+    half_hours = float(duration) * 2
+    if half_hours != int(half_hours) or not 1 <= half_hours <= MAX_INDEXED_HALF_HOURS:
+        return None
+    return str(int(half_hours))
+
+def member_blocked_slots(schedule):
+    """
+    For every indexed duration and weekday, 1 if the member is busy for a meeting starting at that slot.
+    """
+    blocked = {}
+    for half_hours in range(1, MAX_INDEXED_HALF_HOURS + 1):
+        duration = half_hours / 2
+        blocked[str(half_hours)] = {
+            day: [
+                int(any(wday == day and is_time_overlapping(time_slot, duration, start_time, end_time) for wday, start_time, end_time in schedule))
+                for time_slot in TIME_SLOTS
+            ]
+            for day in WEEKDAYS
+        }
+    return blocked
+
+def apply_member_change(index, old_schedule, new_schedule):
+    """
+    Update the per-weekday busy counts in place: subtract the old intervals, add the new ones.
+    A schedule of None means the member has no timetable.
+    """
+    counts = index["counts"]
+    for schedule, sign in ((old_schedule, -1), (new_schedule, 1)):
+        if schedule is None:
+            continue
+        for key, days in member_blocked_slots(schedule).items():
+            for day, slots in days.items():
+                day_counts = counts[key][day]
+                for i, busy in enumerate(slots):
+                    day_counts[i] += sign * busy
+
+    if old_schedule is None and new_schedule is not None:
+        index["scheduled_count"] += 1
+    elif old_schedule is not None and new_schedule is None:
+        index["scheduled_count"] -= 1
+
+def build_group_index(channel_id, members, users_schedule, member_versions):
+    index = {
+        "group_id": get_group_id(channel_id, members),
+        "channel_id": channel_id,
+        "members": sorted(members),
+        "member_versions": member_versions,
+        "scheduled_count": 0,
+        "counts": {
+            str(half_hours): {day: [0] * len(TIME_SLOTS) for day in WEEKDAYS}
+            for half_hours in range(1, MAX_INDEXED_HALF_HOURS + 1)
+        },
+        "stale": False,
+        "version": 0
+    }
+    for member in members:
+        if member in users_schedule:
+            apply_member_change(index, None, users_schedule[member])
+    return index
+
+def load_group_index(group_id):
+    item = index_table.get_item(Key={"group_id": group_id}, ConsistentRead=True).get("Item")
+    if not item:
+        return None
+    return from_item(item)
+
+def from_item(item):
+    # 갱신을 놓쳐 stale 로 표시된 인덱스는 다시 만들 때 버전만 필요함
+    if item.get("stale"):
+        return {"group_id": item["group_id"], "stale": True, "version": int(item.get("version", 0))}
+    return {
+        "group_id": item["group_id"],
+        "channel_id": item["channel_id"],
+        "members": list(item["members"]),
+        "member_versions": dict(item.get("member_versions", {})),
+        "scheduled_count": int(item["scheduled_count"]),
+        "counts": json.loads(item["counts"]),
+        "stale": False,
+        "version": int(item["version"])
+    }
+
+def save_group_index(index, expected_version=None):
+    """
+    Write the index. Without expected_version the index must not exist yet; with it, the
+    stored version must match. Otherwise fail with ConditionalCheckFailedException.
+    """
+    item = dict(index, counts=json.dumps(index["counts"]), version=index["version"] + 1)
+    if expected_version is None:
+        index_table.put_item(
+            Item=item,
+            ConditionExpression=Attr("group_id").not_exists()
+        )
+    else:
+        index_table.put_item(
+            Item=item,
+            ConditionExpression=Attr("version").eq(expected_version)
+        )
+    index["version"] += 1
+
+def mark_group_index_stale(group_id):
+    """
+    Flag the index so its next read rebuilds it from the stored timetables.
+    Bumping the version also makes any concurrent conditional write of the old counts fail.
+    """
+    index_table.update_item(
+        Key={"group_id": group_id},
+        UpdateExpression="SET stale = :stale ADD version :one",
+        ExpressionAttributeValues={":stale": True, ":one": 1}
+    )
+    print(f"[INFO] 그룹 인덱스를 재생성 대상으로 표시: {group_id}")
+
+def register_group_members(group_id, members):
+    for member in members:
+        membership_table.update_item(
+            Key={"member_id": member},
+            UpdateExpression="ADD group_ids :group_id",
+            ExpressionAttributeValues={":group_id": {group_id}}
+        )
+
+def get_member_group_ids(member):
+    item = membership_table.get_item(Key={"member_id": member}, ConsistentRead=True).get("Item")
+    return sorted(item.get("group_ids", set())) if item else []
+
+def find_best_time_slot_from_index(index, duration, weekdays):
+    """
+    Same result as eventScheduleAdjusting.find_best_time_slot, in O(slots).
+    The index only holds counts, so unavailable people are not returned.
+    """
+    counts = index["counts"][duration_key(duration)]
+    best_time_slots = []
+    max_participants = 0
+
+    for day in weekdays:
+        day_counts = counts.get(day)
+        for i, time_slot in enumerate(TIME_SLOTS):
+            participants = index["scheduled_count"] - (day_counts[i] if day_counts else 0)
+            if participants > max_participants:
+                max_participants = participants
+                best_time_slots = [(day, time_slot)]
+            elif participants == max_participants:
+                best_time_slots.append((day, time_slot))
+
+    return best_time_slots, max_participants, []
+
+def get_group_best_time_slot(channel_id, participants, duration, weekdays):
+    """
+    Find the best time slots for a channel's member group using the materialized index,
+    building it from the stored timetables the first time the group is seen or after a
+    timetable change could not be applied to it.
+    """
+    if duration_key(duration) is None:
+        users_schedule = eventScheduleAdjusting.get_user_schedules(participants)
+        return eventScheduleAdjusting.find_best_time_slot(users_schedule, participants, duration, weekdays)
+
+    group_id = get_group_id(channel_id, participants)
+    index = load_group_index(group_id)
+    if index is None or index["stale"]:
+        index = rebuild_group_index(channel_id, participants, index)
+
+    return find_best_time_slot_from_index(index, duration, weekdays)
+
+def rebuild_group_index(channel_id, members, stale_index=None):
+    """
+    Build the index from the stored timetables and write it, either as a new item or over
+    a stale one. Members are registered first, so a timetable upload that races the build
+    either sees the index or marks it stale. If another invocation wins the write, the
+    freshly built index is still returned for this query.
+    """
+    group_id = get_group_id(channel_id, members)
+    register_group_members(group_id, members)
+
+    user_items = eventScheduleAdjusting.get_user_schedule_items(members, consistent_read=True)
+    users_schedule = {name: eventScheduleAdjusting.parse_schedule(user["schedule"]) for name, user in user_items.items()}
+    member_versions = {member: user_items[member].get("createdAt", "") if member in user_items else "" for member in members}
+    index = build_group_index(channel_id, members, users_schedule, member_versions)
+
+    try:
+        if stale_index is None:
+            save_group_index(index)
+            print(f"그룹 인덱스 생성 완료: {group_id}")
+        else:
+            index["version"] = stale_index["version"]
+            save_group_index(index, stale_index["version"])
+            print(f"오래된 그룹 인덱스 재생성 완료: {group_id}")
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        # 다른 요청이 먼저 저장하거나 stale 로 표시함 - 다음 조회 때 다시 확인
+        print(f"[INFO] 그룹 인덱스 저장 경합: {group_id}")
+    return index
+
+def apply_to_group_index(group_id, user_id, old_schedule, old_created_at, new_schedule, new_created_at):
+    """
+    Apply one member's timetable change to one group index. The change is only applied
+    when the index was built from the timetable being replaced (its member_versions entry
+    equals old_created_at); otherwise the index is marked stale and rebuilt on its next read.
+    """
+    for _ in range(MAX_UPDATE_RETRIES):
+        index = load_group_index(group_id)
+        if index is None:
+            # 아직 만들어지는 중인 인덱스 - stale 자리표시를 먼저 넣어 빌드 쪽 저장을 실패시킴
+            try:
+                index_table.put_item(
+                    Item={"group_id": group_id, "stale": True, "version": 0},
+                    ConditionExpression=Attr("group_id").not_exists()
+                )
+                return
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                continue
+        if index["stale"]:
+            return
+        if index["member_versions"].get(user_id, "") != old_created_at:
+            # 인덱스가 이전 시간표로 만들어지지 않았음 - 차이를 더하면 틀어지므로 재생성
+            mark_group_index_stale(group_id)
+            return
+
+        expected_version = index["version"]
+        apply_member_change(index, old_schedule, new_schedule)
+        index["member_versions"][user_id] = new_created_at
+        try:
+            save_group_index(index, expected_version)
+            return
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # 다른 요청이 먼저 갱신함 - 다시 읽어서 적용
+
+    print(f"[ERROR] 그룹 인덱스 갱신 실패: {group_id}")
+    mark_group_index_stale(group_id)
+
+def update_group_indexes(user_id, old_schedule, old_created_at, new_schedule, new_created_at):
+    """
+    Apply a member's timetable change to every group index that contains them.
+    old_created_at is the createdAt of the replaced timetable ("" if none), read
+    consistently; new_created_at is the new one's.
+    """
+    group_ids = get_member_group_ids(user_id)
+    for group_id in group_ids:
+        try:
+            apply_to_group_index(group_id, user_id, old_schedule, old_created_at, new_schedule, new_created_at)
+        except ClientError as e:
+            print(f"[ERROR] 그룹 인덱스 갱신 중 오류 발생: {group_id} {e}")
+            # 반영되지 않은 인덱스는 member_versions 가 맞지 않아 다음 업로드 때 재생성됨
+    return len(group_ids)
@@ -0,0 +1,148 @@
+import json
+from datetime import datetime
+import boto3
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+import batchMeetingScheduler
+
+dynamodb = boto3.resource("dynamodb")
+proposal_table = dynamodb.Table('openProposals')
+
+DAYS_KOREAN = {
+    "Monday": "월",
+    "Tuesday": "화",
+    "Wednesday": "수",
+    "Thursday": "목",
+    "Friday": "금",
+    "Saturday": "토",
+    "Sunday": "일"
+}
+
+
+def get_proposal_id(channel_id, thread_ts):
+    return f"{channel_id}#{thread_ts}"
+
+def solve_proposal(channel_id, participants, start_date, end_date, duration, thread_ts=None):
+    exclude_meeting_id = get_proposal_id(channel_id, thread_ts) if thread_ts else None
+    return batchMeetingScheduler.find_best_dated_slots(channel_id, participants, start_date, end_date, duration, exclude_meeting_id)
+
+def register_proposal(channel_id, thread_ts, participants, start_date, end_date, duration, best_time_slots, max_participants, message_text=None):
+    """
+    Record (or refresh) an open proposal with the solver result it was posted with.
+    message_text is the bot's proposal message, kept so a re-solve can edit it in place.
+    """
+    item = {
+        "proposal_id": get_proposal_id(channel_id, thread_ts),
+        "channel_id": channel_id,
+        "thread_ts": thread_ts,
+        "participants": participants,
+        "start_date": start_date,
+        "end_date": end_date,
+        "duration": str(duration),
+        "best_time_slots": json.dumps(best_time_slots),
+        "max_participants": max_participants,
+        "createdAt": datetime.utcnow().isoformat()
+    }
+    if message_text:
+        item["message_text"] = message_text
+    proposal_table.put_item(Item=item)
+    print(f"[INFO] 회의 제안 등록 완료: {item['proposal_id']}")
+
+def refresh_proposal(channel_id, thread_ts, best_time_slots, max_participants):
+    """
+    Store a new solver result for a proposal that is still open.
+    Returns False without writing if the proposal was closed (or never registered).
+    """
+    try:
+        proposal_table.update_item(
+            Key={"proposal_id": get_proposal_id(channel_id, thread_ts)},
+            UpdateExpression="SET best_time_slots = :slots, max_participants = :max",
+            ConditionExpression=Attr("proposal_id").exists(),
+            ExpressionAttributeValues={
+                ":slots": json.dumps(best_time_slots),
+                ":max": max_participants
+            }
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+
+def close_proposal(channel_id, thread_ts):
+    proposal_table.delete_item(Key={"proposal_id": get_proposal_id(channel_id, thread_ts)})
+
+def find_open_proposals(user_id):
+    scan_kwargs = {"FilterExpression": Attr("participants").contains(user_id)}
+    proposals = []
+    while True:
+        response = proposal_table.scan(**scan_kwargs)
+        proposals.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return proposals
+
+def format_best_slot(best_time_slots, max_participants):
+    if not best_time_slots:
+        return "가능한 시간 없음"
+    date, time = best_time_slots[0]
+    day = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
+    return f"{date} ({DAYS_KOREAN[day]}) {time} (참석 가능 인원: {max_participants}명)"
+
+def resolve_proposals_for_user(user_id, slack_outbound):
+    """
+    Re-run only the solver for the open proposals a user takes part in after their
+    timetable changed. When the best slot moves, the bot's proposal message is edited
+    with chat_update (several changes in one invocation collapse into one edit); a
+    proposal without a stored message gets a reply in its thread instead.
+    Returns the number of proposals whose best slot changed.
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    changed = 0
+
+    for proposal in find_open_proposals(user_id):
+        channel_id = proposal["channel_id"]
+        thread_ts = proposal["thread_ts"]
+
+        # 기간이 지난 제안은 정리
+        if proposal["end_date"] < today:
+            close_proposal(channel_id, thread_ts)
+            continue
+
+        participants = list(proposal["participants"])
+        old_slots = [tuple(slot) for slot in json.loads(proposal["best_time_slots"])]
+        old_max = int(proposal["max_participants"])
+
+        best_time_slots, max_participants, unavailable_people = solve_proposal(
+            channel_id, participants, proposal["start_date"], proposal["end_date"], proposal["duration"], thread_ts
+        )
+
+        old_best = old_slots[0] if old_slots else None
+        new_best = best_time_slots[0] if best_time_slots else None
+        if (old_best, old_max) == (new_best, max_participants):
+            continue
+
+        # 그 사이 확정되어 닫힌 제안은 건너뜀
+        if not refresh_proposal(channel_id, thread_ts, best_time_slots, max_participants):
+            continue
+        changed += 1
+
+        response_message = f"<@{user_id}>님의 시간표가 바뀌어서 추천 회의 시간이 바뀌었어요.\n"
+        response_message += f"*이전*: {format_best_slot(old_slots, old_max)}\n"
+        response_message += f"*변경*: {format_best_slot(best_time_slots, max_participants)}"
+
+        if proposal.get("message_text"):
+            slack_outbound.update_message(
+                channel=channel_id,
+                ts=thread_ts,
+                text=f"{proposal['message_text']}\n\n{response_message}"
+            )
+        else:
+            slack_outbound.post_message(
+                channel=channel_id,
+                text=response_message,
+                thread_ts=thread_ts
+            )
+
+    return changed
@@ -0,0 +1,183 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from slack_sdk.errors import SlackApiError
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        # Retry-After 로 막혀있는 시각
+        self.blocked_until = 0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now):
+        """
+        Seconds until a message can be sent on this channel. (0 if ready)
+        """
+        self.refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class OutboundMessage:
+    def __init__(self, method, channel, text, thread_ts=None, ts=None):
+        self.method = method
+        self.channel = channel
+        self.text = text
+        self.thread_ts = thread_ts
+        self.ts = ts
+        self.retries = 0
+        self.future = Future()
+
+    def coalesce_key(self):
+        # 같은 메시지의 수정, 같은 스레드로의 답글은 하나로 합칠 수 있음
+        if self.method == 'chat_update':
+            return ('chat_update', self.channel, self.ts)
+        if self.thread_ts:
+            return ('chat_postMessage', self.channel, self.thread_ts)
+        return None
+
+
+class SlackMessageQueue:
+    """
+    Outbound Slack messages, sent from a background thread.
+    Each channel is paced by its own token bucket, 429 responses honor Retry-After,
+    and pending messages to the same thread (or updates to the same message) are merged.
+    """
+
+    def __init__(self, client, rate=1.0, burst=2, max_retries=3):
+        self.client = client
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.pending = deque()
+        self.buckets = {}
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.thread = None
+        # 아직 결과를 확인하지 않은 메시지
+        self.unreported = []
+
+    def post_message(self, channel, text, thread_ts=None):
+        return self.enqueue(OutboundMessage('chat_postMessage', channel, text, thread_ts=thread_ts))
+
+    def update_message(self, channel, ts, text):
+        return self.enqueue(OutboundMessage('chat_update', channel, text, ts=ts))
+
+    def enqueue(self, message):
+        with self.condition:
+            key = message.coalesce_key()
+            if key:
+                for queued in self.pending:
+                    if queued.coalesce_key() != key:
+                        continue
+                    if message.method == 'chat_update':
+                        # 최신 내용으로 덮어씀
+                        queued.text = message.text
+                    else:
+                        queued.text += "\n\n" + message.text
+                    return queued.future
+
+            self.pending.append(message)
+            self.unreported.append(message)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+            return message.future
+
+    def flush(self, timeout=None):
+        """
+        Block until every queued message has been sent or failed.
+        Lambda freezes the container after the handler returns, so call this before returning.
+        Returns (completed, failed): completed is False if the timeout expired first, and
+        failed lists (message, exception) for every message that could not be sent since
+        the last flush.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        completed = True
+        with self.condition:
+            while self.pending or self.in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    completed = False
+                    break
+                self.condition.wait(remaining)
+
+            failed = [(message, message.future.exception()) for message in self.unreported if message.future.done() and message.future.exception()]
+            self.unreported = [message for message in self.unreported if not message.future.done()]
+        return completed, failed
+
+    def next_ready(self):
+        """
+        Pop the first message whose channel has a token, or return the seconds to wait.
+        """
+        now = time.monotonic()
+        wait = None
+        for message in self.pending:
+            bucket = self.buckets.setdefault(message.channel, TokenBucket(self.rate, self.burst))
+            channel_wait = bucket.wait_time(now)
+            if channel_wait == 0:
+                bucket.consume()
+                self.pending.remove(message)
+                return message, 0
+            wait = channel_wait if wait is None else min(wait, channel_wait)
+        return None, wait
+
+    def run(self):
+        while True:
+            with self.condition:
+                message, wait = self.next_ready()
+                if message is None:
+                    if not self.pending:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(wait)
+                    continue
+                self.in_flight += 1
+
+            try:
+                self.send(message)
+            finally:
+                with self.condition:
+                    self.in_flight -= 1
+                    self.condition.notify_all()
+
+    def send(self, message):
+        try:
+            if message.method == 'chat_update':
+                response = self.client.chat_update(channel=message.channel, ts=message.ts, text=message.text)
+            else:
+                response = self.client.chat_postMessage(channel=message.channel, text=message.text, thread_ts=message.thread_ts)
+            message.future.set_result(response)
+        except SlackApiError as e:
+            if e.response.status_code == 429 and message.retries < self.max_retries:
+                headers = e.response.headers or {}
+                retry_after = float(headers.get('Retry-After', headers.get('retry-after', 1)))
+                print(f"Slack rate limited on {message.channel}, retrying after {retry_after}s")
+
+                with self.condition:
+                    bucket = self.buckets.setdefault(message.channel, TokenBucket(self.rate, self.burst))
+                    bucket.blocked_until = time.monotonic() + retry_after
+                    message.retries += 1
+                    self.pending.appendleft(message)
+                return
+            print(f"Slack API 에러: {e.response['error']}")
+            message.future.set_exception(e)
+        except Exception as e:
+            print(f"Slack 메시지 전송 중 오류 발생: {e}")
+            message.future.set_exception(e)
@@ -12,6 +12,10 @@ from getClaudeTimetableResponse import get_claude_timetable_response
 from getClaudeMeetingResponse import get_claude_meeting_response
 from getClaudeMeetingPreference import get_claude_meeting_preference
 import eventScheduleAdjusting
+import groupAvailabilityIndex
+import batchMeetingScheduler
+import openProposalRegistry
+from slackMessageQueue import SlackMessageQueue
 import re
 
 # 로깅 설정
@@ -21,6 +25,8 @@ logger.setLevel(logging.INFO)
 # Slack & Bedrock 클라이언트 초기화
 SLACK_BOT_TOKEN = os.environ['SLACK_BOT_TOKEN']
 slack_client = WebClient(token=SLACK_BOT_TOKEN)
+# 채널별 속도 제한을 지키며 백그라운드로 전송
+slack_outbound = SlackMessageQueue(slack_client)
 
 my_config = Config(
     region_name = 'us-west-2'
@@ -87,6 +93,8 @@ def lambda_handler(event, context):
 
     event_type = body['type']
     claude_response = ''
+    # 전송이 끝난 뒤 등록할 회의 제안 (전송 Future, 제안 정보)
+    new_proposal = None
     thread_ts = body['event']['ts']
     channel_id = body['event']['channel']
     user_id = body['event'].get('user')
@@ -108,18 +116,19 @@ def lambda_handler(event, context):
 
             if parent_user_id != bot_user_id:
               # 봇을 통해 회의 정보 추출
-              meeting_info, request = get_claude_meeting_response(bedrock_runtime, combined_message)
-              # remove the bot from participants
-              meeting_info['participants'] = [participant for participant in meeting_info['participants'] if participant != bot_user_id]
+              meeting_info, request = get_claude_meeting_response(bedrock_runtime, combined_message, bot_user_id)
 
               if request:
                   # Request additional informatio
-                  slack_client.chat_postMessage(
+                  slack_outbound.post_message(
                       channel=channel_id,
                       text=f'''<@{user_id}> {request} ''',
                       thread_ts=thread_ts
                   )
               else:
+                  # remove the bot from participants
+                  meeting_info['participants'] = [participant for participant in meeting_info['participants'] if participant != bot_user_id]
+
                   [start_date, end_date] = meeting_info['meeting_date_range'].split(' to ')
                   participants_id = meeting_info['participants']
                   duration = meeting_info['meeting_duration']
@@ -137,10 +146,22 @@ def lambda_handler(event, context):
                   response_message += "다들 회의 괜찮으신가요? 의견을 남겨주세요! 😊"
 
                   # Send extracted meeting information
-                  slack_client.chat_postMessage(
+                  posted = slack_outbound.post_message(
                       channel=channel_id,
                       text=response_message
                   )
+
+                  # 시간표가 바뀌면 다시 계산할 수 있도록 열린 제안으로 등록
+                  best_time_slots, max_participants, unavailable_people = openProposalRegistry.solve_proposal(channel_id, participants_id, start_date, end_date, duration)
+                  new_proposal = (posted, {
+                      "participants": participants_id,
+                      "start_date": start_date,
+                      "end_date": end_date,
+                      "duration": duration,
+                      "best_time_slots": best_time_slots,
+                      "max_participants": max_participants,
+                      "message_text": response_message
+                  })
             else:
               # 유저 의견을 받고 최종 회의 일정을 잡는다.
               schedule_regex = r"\*회의 일정\*:\s*(\d{4}-\d{2}-\d{2})\s*~\s*(\d{4}-\d{2}-\d{2})"
@@ -159,14 +180,15 @@ def lambda_handler(event, context):
 
               print('start_date:', start_date, 'end_date:', end_date, 'duration:', duration, 'participants:', participants)
 
-              users_schedule = eventScheduleAdjusting.get_user_schedules(participants)
-
-          
-              weekdays = eventScheduleAdjusting.date_to_weekdays(start_date, end_date)
+              proposal_ts = body['event'].get('thread_ts', thread_ts)
+              proposal_id = openProposalRegistry.get_proposal_id(channel_id, proposal_ts)
 
-
-
-              best_time_slots, max_participants, unavailable_people = eventScheduleAdjusting.find_best_time_slot(users_schedule, participants, duration, weekdays)
+              # 확정된 다른 회의는 바쁜 시간으로 취급 (없으면 그룹 가용 인덱스로 바로 계산)
+              best_time_slots, max_participants, unavailable_people = batchMeetingScheduler.find_best_dated_slots(
+                  channel_id, participants, start_date, end_date, duration, exclude_meeting_id=proposal_id
+              )
+              # 아직 열려있는 제안만 갱신 (확정된 회의는 다시 열지 않음)
+              openProposalRegistry.refresh_proposal(channel_id, proposal_ts, best_time_slots, max_participants)
 
               final_meeting_info, is_everyone_has_preference = get_claude_meeting_preference(bedrock_runtime, combined_message, best_time_slots, bot_user_id)
 
@@ -190,10 +212,21 @@ def lambda_handler(event, context):
                   for participant in final_meeting_info['participants']:
                       response_message += f"<@{participant['user_id']}>님 "
               
-                  slack_client.chat_postMessage(
+                  slack_outbound.post_message(
                       channel=channel_id,
                       text=response_message
                   )
+
+                  # 이후 배치 배정에서 바쁜 시간으로 취급하도록 저장
+                  batchMeetingScheduler.save_confirmed_meeting(
+                      proposal_id,
+                      participants,
+                      best_date,
+                      best_time,
+                      duration
+                  )
+                  # 확정된 회의는 더 이상 다시 계산하지 않음
+                  openProposalRegistry.close_proposal(channel_id, proposal_ts)
               else:
                   pass
 
@@ -224,7 +257,7 @@ def lambda_handler(event, context):
             readable_schedule = format_schedule(claude_response)
 
             # 슬랙에 메시지 전송
-            slack_client.chat_postMessage(
+            slack_outbound.post_message(
                 channel=channel_id,
                 text=f'''<@{user_id}>
 시간표를 읽어왔어요! 아래는 유저의 시간표에요. 확인해주세요.
@@ -236,6 +269,10 @@ def lambda_handler(event, context):
 
             try:
                 name = body['event']['user']
+                # 그룹 인덱스가 이 시간표로 만들어졌는지 확인하도록 이전 항목을 일관된 읽기로 가져옴
+                old_item = eventScheduleAdjusting.get_user_schedule_items([name], consistent_read=True).get(name)
+                old_schedule = eventScheduleAdjusting.parse_schedule(old_item["schedule"]) if old_item else None
+                old_created_at = old_item.get("createdAt", "") if old_item else ""
 
                 item = {
                     "name": name,
@@ -246,21 +283,64 @@ def lambda_handler(event, context):
                 print(f"[INFO] DynamoDB 저장 완료: {item}")
             except Exception as e:
                 print(f"[ERROR] DynamoDB 저장 중 오류 발생: {e}")
+                item = None
+
+            if item:
+                try:
+                    # 이전 시간표를 빼고 새 시간표를 더해 그룹 인덱스 갱신
+                    new_schedule = eventScheduleAdjusting.parse_schedule(claude_response)
+                    updated_groups = groupAvailabilityIndex.update_group_indexes(name, old_schedule, old_created_at, new_schedule, item['createdAt'])
+                    print(f"[INFO] 그룹 인덱스 {updated_groups}개 갱신 완료")
+                except Exception as e:
+                    print(f"[ERROR] 그룹 인덱스 갱신 중 오류 발생: {e}")
+
+                try:
+                    # 이 유저가 포함된 열린 제안만 다시 계산 (LLM 호출 없음)
+                    changed_proposals = openProposalRegistry.resolve_proposals_for_user(name, slack_outbound)
+                    print(f"[INFO] 추천 시간이 바뀐 제안: {changed_proposals}개")
+                except Exception as e:
+                    print(f"[ERROR] 열린 회의 제안 재계산 중 오류 발생: {e}")
         
+        response = {
+            'statusCode': 200,
+            'body': json.dumps({'message': 'Success'})
+        }
     except SlackApiError as e:
         logger.error(f"Slack API 에러: {e.response['error']}")
-        return {
+        response = {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
     except Exception as e:
         logger.error(f"에러 발생: {str(e)}")
-        return {
+        response = {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
 
-    return {
-        'statusCode': 200,
-        'body': json.dumps({'message': 'Success'})
-    }
\ No newline at end of file
+    # 람다가 종료되기 전에 남은 슬랙 메시지를 모두 보냄
+    completed, failed = slack_outbound.flush(timeout=30)
+    if not completed:
+        logger.error("Slack 메시지 전송이 제한 시간 안에 끝나지 않았어요.")
+    for message, error in failed:
+        logger.error(f"Slack 메시지 전송 실패 ({message.method}, {message.channel}): {error}")
+
+    # 제안 메시지의 ts 로 열린 제안 등록
+    if new_proposal and new_proposal[0].done() and not new_proposal[0].exception():
+        posted, proposal = new_proposal
+        try:
+            openProposalRegistry.register_proposal(channel_id, posted.result()['ts'], **proposal)
+        except Exception as e:
+            logger.error(f"회의 제안 등록 중 오류 발생: {e}")
+            response = {
+                'statusCode': 500,
+                'body': json.dumps({'error': str(e)})
+            }
+
+    if (not completed or failed) and response['statusCode'] == 200:
+        response = {
+            'statusCode': 500,
+            'body': json.dumps({'error': f"Slack 메시지 {len(failed)}개 전송 실패" if completed else "Slack 메시지 전송 시간 초과"})
+        }
+
+    return response
\ No newline at end of file